@@ -1,6 +1,6 @@
 """CRE Intel Parsers - Corporate Registry, Transfer List, Building Permits, Entity Matching"""
 
 from .corporate_registry import parse_corporate_registry
-from .transfer_list import parse_transfer_list
-from .building_permits import parse_building_permits
+from .transfer_list import parse_transfer_list, iter_transfer_list
+from .building_permits import parse_building_permits, iter_building_permits
 from .entity_matcher import match_company, match_person, match_address, cross_reference
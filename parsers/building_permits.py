@@ -4,47 +4,153 @@ Parses City of Saskatoon weekly building permit reports (PDF).
 Filters to commercial permits (COMM- prefix) with value > $350,000 only.
 """
 
-from typing import Optional, List
-import pdfplumber
+from typing import Iterator, Optional, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+import os
 import re
 import json
 import sys
 from pathlib import Path
 
+try:
+    import pymupdf
+except ImportError:
+    # Slower pdfminer-based fallback for environments without MuPDF
+    pymupdf = None
+    import pdfplumber
+
+# Worker processes only pay for their start-up cost on reports with at
+# least this many pages each
+MIN_PAGES_PER_WORKER = 10
+
+# Collapse PyMuPDF's column padding so text matches pdfplumber's single-spaced lines
+_HSPACE_RE = re.compile(r"[ \t]+")
+_LINE_EDGE_RE = re.compile(r" ?\n ?")
+
+
+# Permit patterns: ACC-, COMM-, DECK-, DEMO-, HALT-, INST-, MFR-, SFD-, SIGN-, etc.
+_BLOCK_SPLIT_RE = re.compile(r"(?=(?:ACC|COMM|DECK|DEMO|HALT|INST|MFR|SFD|SIGN|TENT|PLUMB|FIRE|MOVE)-\d{4}-\d+)")
+_BP_RE = re.compile(r"(COMM-\d{4}-\d+)")
+_DATE_RE = re.compile(r"(\d{1,2}/\d{1,2}/\d{4})")
+_VALUE_RE = re.compile(r"\$([0-9,]+)\s*$", re.MULTILINE)
+_ADDR_RES = [
+    re.compile(p, re.IGNORECASE) for p in (
+        # Standard: 123 Street Name TYPE [DIR] [#unit], Saskatoon, SK
+        r"(\d+\s+(?:\d+\s+)?[A-Za-z][A-Za-z\s]+?(?:AVE|ST|DR|RD|BLVD|CRES|PL|WAY|LANE|CRT|TERR|PKWY|HWY|CIRCLE|MANOR|MEWS|TRAIL|GATE)\s*[NSEW]?\s*(?:#\s*\d+)?),?\s*\n?\s*Saskatoon,?\s*SK",
+        # With unit: 123 Street #456, Saskatoon
+        r"(\d+\s+[A-Za-z][A-Za-z\s]+?(?:AVE|ST|DR|RD|BLVD|CRES)\s*[NSEW]?\s*#\d+),?\s*\n?\s*Saskatoon",
+    )
+]
+_WS_RE = re.compile(r"\s+")
+_SCOPE_RE = re.compile(r"(Commercial Building|Commercial)\n(.+?)(?:\n|$)")
+_STOP_RE = re.compile(r"\$|(?:ACC|COMM|DECK|DEMO)-")
+_COMPANY_RE = re.compile(
+    r"([A-Z][A-Za-z\s&\-']+(?:Inc|Ltd|Corp|Co|LP|LLP|Group|Properties|Investments|Construction|Development|Developments|Holdings|Realty|Real Estate|Partnership|Trust|Association)\.?(?:\s+(?:Inc|Ltd|Corp)\.?)?)"
+)
+
 
 def parse_building_permits(pdf_path: str, min_value: float = 350_000) -> List[dict]:
     """Parse building permit PDF, returning only commercial permits above min_value."""
-    permits = []
+    return list(iter_building_permits(pdf_path, min_value))
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            text = page.extract_text()
-            if not text:
-                continue
 
-            # Extract week date range from header if present
-            week_match = re.search(r"First Day:\s*(.+?)\n.*?Last Day:\s*(.+?)(?:\n|$)", text)
+def iter_building_permits(pdf_path: str, min_value: float = 350_000) -> Iterator[dict]:
+    """Like parse_building_permits, but yields permits in page order as they are parsed."""
+    n_pages = _page_count(pdf_path)
+    max_workers = _get_max_workers(n_pages)
+
+    # Reports too small to keep more than one worker busy are parsed here
+    if max_workers <= 1:
+        yield from _iter_page_range(pdf_path, range(n_pages), min_value)
+        return
+
+    # Pages are independent, so parse them in parallel. Each worker gets one
+    # contiguous page range so every process opens the PDF only once.
+    chunk_size = -(-n_pages // max_workers)
+    page_ranges = [range(start, min(start + chunk_size, n_pages)) for start in range(0, n_pages, chunk_size)]
+    process_pages = partial(_process_pages, pdf_path, min_value=min_value)
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        yield from chain.from_iterable(ex.map(process_pages, page_ranges))
+
+
+def _get_max_workers(n_pages: int) -> int:
+    """Number of worker processes to use for a PDF with n_pages pages."""
+    return max(1, min(os.cpu_count() or 1, n_pages // MIN_PAGES_PER_WORKER, 8))
+
 
-            # Split into permit blocks - each starts with a BP number pattern
-            # Permit patterns: ACC-, COMM-, DECK-, DEMO-, HALT-, INST-, MFR-, SFD-, SIGN-, etc.
-            blocks = re.split(r"(?=(?:ACC|COMM|DECK|DEMO|HALT|INST|MFR|SFD|SIGN|TENT|PLUMB|FIRE|MOVE)-\d{4}-\d+)", text)
+def _process_pages(pdf_path: str, page_nums: range, min_value: float) -> List[dict]:
+    """Parse a range of pages in a worker process, returning their permits."""
+    return list(_iter_page_range(pdf_path, page_nums, min_value))
 
-            for block in blocks:
-                block = block.strip()
-                if not block:
-                    continue
 
-                # Only process COMM permits
-                if not block.startswith("COMM-"):
-                    continue
+def _iter_page_range(pdf_path: str, page_nums: range, min_value: float) -> Iterator[dict]:
+    """Yield commercial permits above min_value from the given pages, opening the PDF once."""
+    if pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            for page_num in page_nums:
+                yield from _parse_page(_mupdf_page_text(doc[page_num]), page_num, min_value)
+        return
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num in page_nums:
+            page = pdf.pages[page_num]
+            # extract_text_simple clusters chars into lines without extract_text's layout pass
+            text = page.extract_text_simple(x_tolerance=3, y_tolerance=3)
+            # Each page is read once, so drop its cached layout objects
+            page.close()
+            yield from _parse_page(text, page_num, min_value)
+
+
+def _parse_page(text: Optional[str], page_num: int, min_value: float) -> List[dict]:
+    """Parse one page's text, returning its commercial permits above min_value."""
+    if not text:
+        return []
+
+    # Pages without any commercial permits (common in residential-heavy
+    # weeks) have nothing to keep, so skip the split entirely. Blocks
+    # before the first COMM- are discarded anyway, so start there.
+    comm_start = text.find("COMM-")
+    if comm_start < 0:
+        return []
+
+    # Split into permit blocks - each starts with a BP number pattern.
+    # Other prefixes still mark where a COMM block ends.
+    blocks = _BLOCK_SPLIT_RE.split(text[comm_start:])
+
+    permits = []
+    for block in blocks:
+        block = block.strip()
+        if not block:
+            continue
+
+        # Only process COMM permits
+        if not block.startswith("COMM-"):
+            continue
 
-                permit = _parse_permit_block(block, page_num)
-                if permit and permit.get("value") and permit["value"] >= min_value:
-                    permits.append(permit)
+        permit = _parse_permit_block(block, page_num)
+        if permit and permit.get("value") and permit["value"] >= min_value:
+            permits.append(permit)
 
     return permits
 
 
+def _page_count(pdf_path: str) -> int:
+    """Number of pages in the PDF."""
+    if pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            return doc.page_count
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def _mupdf_page_text(page) -> str:
+    """Extract a PyMuPDF page's text with one line per baseline, like pdfplumber."""
+    # sort=True joins same-baseline spans into one line instead of one per column
+    text = _HSPACE_RE.sub(" ", page.get_text("text", sort=True))
+    return _LINE_EDGE_RE.sub("\n", text).strip()
+
+
 def _parse_permit_block(block: str, page_num: int) -> Optional[dict]:
     """Parse a single permit text block into structured data."""
     lines = block.split("\n")
@@ -52,14 +158,14 @@ def _parse_permit_block(block: str, page_num: int) -> Optional[dict]:
         return None
 
     # Extract permit number
-    bp_match = re.match(r"(COMM-\d{4}-\d+)", lines[0])
+    bp_match = _BP_RE.match(lines[0])
     if not bp_match:
         return None
 
     permit_number = bp_match.group(1)
 
     # Extract issue date (M/D/YYYY format)
-    date_match = re.search(r"(\d{1,2}/\d{1,2}/\d{4})", block)
+    date_match = _DATE_RE.search(block)
     issue_date = None
     if date_match:
         parts = date_match.group(1).split("/")
@@ -67,47 +173,42 @@ def _parse_permit_block(block: str, page_num: int) -> Optional[dict]:
 
     # Extract value ($XXX,XXX or $XXX format at end of lines)
     value = None
-    value_match = re.search(r"\$([0-9,]+)\s*$", block, re.MULTILINE)
+    value_match = _VALUE_RE.search(block)
     if value_match:
         value = float(value_match.group(1).replace(",", ""))
 
     # Extract address - look for street patterns in the block
     address = None
     # Try multiple patterns for address extraction
-    addr_patterns = [
-        # Standard: 123 Street Name TYPE [DIR] [#unit], Saskatoon, SK
-        r"(\d+\s+(?:\d+\s+)?[A-Za-z][A-Za-z\s]+?(?:AVE|ST|DR|RD|BLVD|CRES|PL|WAY|LANE|CRT|TERR|PKWY|HWY|CIRCLE|MANOR|MEWS|TRAIL|GATE)\s*[NSEW]?\s*(?:#\s*\d+)?),?\s*\n?\s*Saskatoon,?\s*SK",
-        # With unit: 123 Street #456, Saskatoon
-        r"(\d+\s+[A-Za-z][A-Za-z\s]+?(?:AVE|ST|DR|RD|BLVD|CRES)\s*[NSEW]?\s*#\d+),?\s*\n?\s*Saskatoon",
-    ]
-    for pattern in addr_patterns:
-        addr_match = re.search(pattern, block, re.IGNORECASE)
+    for addr_re in _ADDR_RES:
+        addr_match = addr_re.search(block)
         if addr_match:
-            address = re.sub(r"\s+", " ", addr_match.group(0)).strip()
+            address = _WS_RE.sub(" ", addr_match.group(0)).strip()
             # Clean trailing comma
             address = address.rstrip(",").strip()
             break
 
     # Extract scope of work / description
     scope = None
-    scope_match = re.search(r"(Commercial Building|Commercial)\n(.+?)(?:\n|$)", block)
+    scope_match = _SCOPE_RE.search(block)
     if scope_match:
         building_type = scope_match.group(1)
         # Collect description lines after building type
         desc_lines = []
         found = False
         for line in lines:
+            line = line.strip()
             if "Commercial" in line and not found:
                 found = True
-                if line.strip() != "Commercial Building" and line.strip() != "Commercial":
-                    desc_lines.append(line.strip())
+                if line != "Commercial Building" and line != "Commercial":
+                    desc_lines.append(line)
                 continue
             if found:
                 # Stop at dollar value or next permit
-                if re.match(r"\$|(?:ACC|COMM|DECK|DEMO)-", line.strip()):
+                if _STOP_RE.match(line):
                     break
-                if line.strip():
-                    desc_lines.append(line.strip())
+                if line:
+                    desc_lines.append(line)
         scope = " - ".join(desc_lines) if desc_lines else None
 
     # Extract owner/applicant - from the text between date and address
@@ -120,7 +221,7 @@ def _parse_permit_block(block: str, page_num: int) -> Optional[dict]:
 
     # Extract work type
     work_type = None
-    if "New" in block and "New" in block.split("\n"):
+    if "New" in lines:
         work_type = "New Construction"
     elif "Alteration/Renovation" in block:
         work_type = "Alteration/Renovation"
@@ -143,14 +244,13 @@ def _parse_permit_block(block: str, page_num: int) -> Optional[dict]:
 def _dedup_owner(name: str) -> str:
     """Fix duplicated owner names from PDF column merge (e.g. 'Wright Construction Wright Co' -> 'Wright Construction')."""
     words = name.split()
-    n = len(words)
     # Check if second half repeats first word(s)
-    for split in range(2, n):
-        first_part = " ".join(words[:split])
-        second_part = " ".join(words[split:])
-        # If the second part starts with a word from the first part, it's likely a dupe
-        if words[split] == words[0] or (len(words[split]) > 3 and words[split] in first_part):
-            return first_part
+    for split in range(2, len(words)):
+        word = words[split]
+        # If the second part starts with a word from the first part, it's likely a dupe.
+        # Words have no spaces, so only a single earlier word can contain it.
+        if word == words[0] or (len(word) > 3 and any(word in w for w in words[:split])):
+            return " ".join(words[:split])
     return name
 
 
@@ -160,10 +260,7 @@ def _extract_owner(block: str, start_pos: int) -> Optional[str]:
     # Look for company-like names (words with Inc, Ltd, Corp, etc.)
     text_after_date = block[start_pos:]
     # Try to find company name patterns
-    company_match = re.search(
-        r"([A-Z][A-Za-z\s&\-']+(?:Inc|Ltd|Corp|Co|LP|LLP|Group|Properties|Investments|Construction|Development|Developments|Holdings|Realty|Real Estate|Partnership|Trust|Association)\.?(?:\s+(?:Inc|Ltd|Corp)\.?)?)",
-        text_after_date
-    )
+    company_match = _COMPANY_RE.search(text_after_date)
     if company_match:
         return company_match.group(1).strip()
     return None
@@ -1,20 +1,83 @@
 """
 Corporate Registry PDF Parser
 Parses Saskatchewan corporate registry profile reports exported as PDF.
-Uses pdfplumber to extract text, then regex to parse structured fields.
+Uses PyMuPDF (or pdfplumber as a fallback) to extract text, then regex to parse structured fields.
 """
 
-import pdfplumber
+from typing import Optional
 import re
 import json
 import sys
 from pathlib import Path
 
+try:
+    import pymupdf
+except ImportError:
+    # Slower pdfminer-based fallback for environments without MuPDF
+    pymupdf = None
+    import pdfplumber
+
+
+_ENTITY_NUMBER_RE = re.compile(r"EntityNumber:\s*(\S+)")
+_ENTITY_NAME_RE = re.compile(r"EntityName:\s*(.+?)(?:\s+ReportDate:)")
+_REPORT_DATE_RE = re.compile(r"ReportDate:\s*(\S+)")
+# Simple "Field value" lines in the entity details block
+_DETAIL_FIELDS = [
+    (re.compile(rf"{field}\s+(.+?)(?:\n|$)"), key)
+    for field, key in [
+        ("EntityType", "entity_type"),
+        ("EntitySubtype", "entity_subtype"),
+        ("EntityStatus", "status"),
+        ("IncorporationDate", "incorporation_date"),
+        ("AnnualReturnDueDate", "annual_return_due"),
+        ("NatureofBusiness", "nature_of_business"),
+    ]
+]
+_PHYSICAL_ADDRESS_RE = re.compile(r"PhysicalAddress\s+(.+?)(?:\n|MailingAddress)", re.DOTALL)
+_MAILING_ADDRESS_RE = re.compile(r"RegisteredOfficeAddresses.*?MailingAddress\s+(.+?)(?:\n[A-Z])", re.DOTALL)
+_DIRECTOR_SECTION_RE = re.compile(r"Directors/Officers\n(.*?)(?:Shareholders|Articles|$)", re.DOTALL)
+_DIRECTOR_ENTRY_RE = re.compile(
+    r"([A-Z][A-Z\s]+?)\((Director|Officer)\)\s+EffectiveDate:\s*(\S+)"
+    r"(?:.*?PhysicalAddress:\s*(.*?)(?:MailingAddress:|$))?"
+    r"(?:.*?OfficeHeld:\s*([A-Z]+))?",
+    re.DOTALL
+)
+_SHAREHOLDER_SECTION_RE = re.compile(r"ShareholderName\s+MailingAddress\s+ShareClass\s+SharesHeld\n(.*?)(?:Articles|$)", re.DOTALL)
+# NAME  ADDRESS CLASS SHARES on one line, plus an optional address continuation
+# line that doesn't start another shareholder or a section. [^\S\n] keeps
+# whitespace matches from running onto the next line.
+_SHAREHOLDER_RE = re.compile(
+    r"^([A-Z](?:[A-Z]|[^\S\n])+?)[^\S\n]{2,}(.+?)[^\S\n]+(CLASS[A-Z])[^\S\n]+(\d+).*"
+    r"(?:\n(?![A-Z](?:[A-Z]|[^\S\n])+?[^\S\n]{2,})(?!Articles|Share|Event|Class)(.+))?",
+    re.MULTILINE
+)
+_SHARE_SECTION_RE = re.compile(r"ClassName\s+VotingRights\s+AuthorizedNumber\s+NumberIssued\n(.*?)(?:EventHistory|$)", re.DOTALL)
+_EVENT_SECTION_RE = re.compile(r"EventHistory\nType\s+Date\n(.*?)$", re.DOTALL)
+# Event type followed by its DD-Mon-YYYY date at the end of the line
+_EVENT_RE = re.compile(r"^(.+?)[^\S\n]+(\d{2}-[A-Z][a-z]{2}-\d{4})$", re.MULTILINE)
+# Strips every line and drops blank ones
+_LINE_EDGES_RE = re.compile(r"\s*\n\s*")
+_WS_RE = re.compile(r"\s+")
+# Section headings; each section regex below starts with one of these
+_SECTION_RE = re.compile(r"RegisteredOfficeAddresses|Directors/Officers|ShareholderName|ClassName|EventHistory")
+
 
 def parse_corporate_registry(pdf_path: str) -> dict:
     """Parse a Saskatchewan corporate registry PDF into structured data."""
-    with pdfplumber.open(pdf_path) as pdf:
-        full_text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+    # Both extractors lay each baseline out as one line with column gaps kept
+    # as runs of spaces, which the shareholder table regex splits on
+    if pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            full_text = "\n".join(page.get_text("text", sort=True) for page in doc)
+    else:
+        with pdfplumber.open(pdf_path) as pdf:
+            # Layout mode is slower than extract_text_simple (which the permit
+            # parser uses), but simple extraction collapses every gap to one
+            # space and shareholder rows would no longer split into columns
+            full_text = "\n".join(page.extract_text(layout=True, x_tolerance=3, y_tolerance=3) for page in pdf.pages)
+    # Indentation and blank lines differ between the two, so drop them;
+    # several fields end where the next line starts with a capital
+    full_text = _LINE_EDGES_RE.sub("\n", full_text).strip()
 
     result = {
         "entity_number": None,
@@ -33,65 +96,55 @@ def parse_corporate_registry(pdf_path: str) -> dict:
         "shareholders": [],
         "share_structure": [],
         "event_history": [],
-        "raw_text": full_text,
     }
 
+    # Section regexes start searching where their heading first appears
+    # rather than from the top of the document, and are skipped when it's absent
+    sections = _find_sections(full_text)
+
     # Entity number
-    m = re.search(r"EntityNumber:\s*(\S+)", full_text)
+    m = _ENTITY_NUMBER_RE.search(full_text)
     if m:
         result["entity_number"] = m.group(1)
 
     # Entity name
-    m = re.search(r"EntityName:\s*(.+?)(?:\s+ReportDate:)", full_text)
+    m = _ENTITY_NAME_RE.search(full_text)
     if m:
         result["entity_name"] = m.group(1).strip()
 
     # Report date
-    m = re.search(r"ReportDate:\s*(\S+)", full_text)
+    m = _REPORT_DATE_RE.search(full_text)
     if m:
         result["report_date"] = m.group(1)
 
     # Entity details
-    for field, key in [
-        ("EntityType", "entity_type"),
-        ("EntitySubtype", "entity_subtype"),
-        ("EntityStatus", "status"),
-        ("IncorporationDate", "incorporation_date"),
-        ("AnnualReturnDueDate", "annual_return_due"),
-        ("NatureofBusiness", "nature_of_business"),
-    ]:
-        m = re.search(rf"{field}\s+(.+?)(?:\n|$)", full_text)
+    for field_re, key in _DETAIL_FIELDS:
+        m = field_re.search(full_text)
         if m:
             result[key] = m.group(1).strip()
 
     # Registered address
-    m = re.search(r"PhysicalAddress\s+(.+?)(?:\n|MailingAddress)", full_text, re.DOTALL)
+    m = _PHYSICAL_ADDRESS_RE.search(full_text)
     if m:
-        result["registered_address"] = re.sub(r"\s+", " ", m.group(1)).strip()
+        result["registered_address"] = _WS_RE.sub(" ", m.group(1)).strip()
 
     # Mailing address (first occurrence under RegisteredOfficeAddresses)
-    m = re.search(r"RegisteredOfficeAddresses.*?MailingAddress\s+(.+?)(?:\n[A-Z])", full_text, re.DOTALL)
+    m = _search_section(_MAILING_ADDRESS_RE, full_text, sections, "RegisteredOfficeAddresses")
     if m:
-        result["mailing_address"] = re.sub(r"\s+", " ", m.group(1)).strip()
+        result["mailing_address"] = _WS_RE.sub(" ", m.group(1)).strip()
 
     # Directors and Officers
     # Pattern: NAME (Role)  EffectiveDate: DATE
-    director_section = re.search(r"Directors/Officers\n(.*?)(?:Shareholders|Articles|$)", full_text, re.DOTALL)
+    director_section = _search_section(_DIRECTOR_SECTION_RE, full_text, sections, "Directors/Officers")
     if director_section:
         section = director_section.group(1)
         # Find all entries like: TRAVIS BATTING(Director) EffectiveDate: 28-Mar-2022
-        entries = re.finditer(
-            r"([A-Z][A-Z\s]+?)\((Director|Officer)\)\s+EffectiveDate:\s*(\S+)"
-            r"(?:.*?PhysicalAddress:\s*(.*?)(?:MailingAddress:|$))?"
-            r"(?:.*?OfficeHeld:\s*([A-Z]+))?" ,
-            section,
-            re.DOTALL
-        )
+        entries = _DIRECTOR_ENTRY_RE.finditer(section)
         for entry in entries:
             name = entry.group(1).strip()
             role = entry.group(2)
             effective_date = entry.group(3)
-            address = re.sub(r"\s+", " ", entry.group(4).strip()) if entry.group(4) else None
+            address = _WS_RE.sub(" ", entry.group(4).strip()) if entry.group(4) else None
             title = entry.group(5) if entry.group(5) else None
 
             person = {
@@ -107,35 +160,24 @@ def parse_corporate_registry(pdf_path: str) -> dict:
                 result["officers"].append(person)
 
     # Shareholders
-    shareholder_section = re.search(r"ShareholderName\s+MailingAddress\s+ShareClass\s+SharesHeld\n(.*?)(?:Articles|$)", full_text, re.DOTALL)
+    shareholder_section = _search_section(_SHAREHOLDER_SECTION_RE, full_text, sections, "ShareholderName")
     if shareholder_section:
-        section = shareholder_section.group(1)
+        section = shareholder_section.group(1).strip()
         # Each shareholder line: NAME ADDRESS CLASS SHARES
-        lines = [l.strip() for l in section.split("\n") if l.strip()]
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            # Try to match: NAME ADDRESS CLASS SHARES
-            m = re.match(r"([A-Z][A-Z\s]+?)\s{2,}(.+?)\s+(CLASS[A-Z])\s+(\d+)", line)
-            if m:
-                # Address may continue on next line
-                address = m.group(2).strip()
-                if i + 1 < len(lines) and not re.match(r"[A-Z][A-Z\s]+?\s{2,}", lines[i + 1]):
-                    # continuation line for address
-                    next_line = lines[i + 1].strip()
-                    if not re.match(r"(Articles|Share|Event|Class)", next_line):
-                        address += " " + next_line
-                        i += 1
-                result["shareholders"].append({
-                    "name": _title_case(m.group(1).strip()),
-                    "address": address,
-                    "share_class": m.group(3),
-                    "shares_held": int(m.group(4)),
-                })
-            i += 1
+        for name, address, share_class, shares_held, continuation in _SHAREHOLDER_RE.findall(section):
+            address = address.strip()
+            # Address may continue on next line
+            if continuation:
+                address += " " + continuation
+            result["shareholders"].append({
+                "name": _title_case(name.strip()),
+                "address": address,
+                "share_class": share_class,
+                "shares_held": int(shares_held),
+            })
 
     # Share structure
-    share_section = re.search(r"ClassName\s+VotingRights\s+AuthorizedNumber\s+NumberIssued\n(.*?)(?:EventHistory|$)", full_text, re.DOTALL)
+    share_section = _search_section(_SHARE_SECTION_RE, full_text, sections, "ClassName")
     if share_section:
         for line in share_section.group(1).split("\n"):
             line = line.strip()
@@ -151,28 +193,38 @@ def parse_corporate_registry(pdf_path: str) -> dict:
                 })
 
     # Event history
-    event_section = re.search(r"EventHistory\nType\s+Date\n(.*?)$", full_text, re.DOTALL)
+    event_section = _search_section(_EVENT_SECTION_RE, full_text, sections, "EventHistory")
     if event_section:
-        for line in event_section.group(1).split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-            # Last token is date (DD-Mon-YYYY)
-            m = re.match(r"(.+?)\s+(\d{2}-[A-Z][a-z]{2}-\d{4})$", line)
-            if m:
-                result["event_history"].append({
-                    "type": m.group(1).strip(),
-                    "date": m.group(2),
-                })
+        section = event_section.group(1).strip()
+        for event_type, date in _EVENT_RE.findall(section):
+            result["event_history"].append({
+                "type": event_type.strip(),
+                "date": date,
+            })
 
-    # Remove raw_text from output (keep it for debugging if needed)
-    del result["raw_text"]
     return result
 
 
+def _find_sections(full_text: str) -> dict:
+    """Map each section heading to the offset of its first occurrence, in one pass."""
+    sections = {}
+    for m in _SECTION_RE.finditer(full_text):
+        sections.setdefault(m.group(0), m.start())
+    return sections
+
+
+def _search_section(pattern: re.Pattern, full_text: str, sections: dict, heading: str) -> Optional[re.Match]:
+    """Search for a pattern beginning with heading, starting from where that heading first appears."""
+    start = sections.get(heading)
+    if start is None:
+        return None
+    return pattern.search(full_text, start)
+
+
 def _title_case(name: str) -> str:
     """Convert ALL CAPS name to Title Case."""
-    return " ".join(w.capitalize() for w in name.lower().split())
+    # Callers only pass [A-Z\s] captures, so str.title() matches per-word capitalize()
+    return " ".join(name.split()).title()
 
 
 def main():
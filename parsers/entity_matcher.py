@@ -4,13 +4,26 @@ Matches companies, people, and properties across data sources using fuzzy matchi
 Links corporate registry entities to transfer list parties and permit applicants.
 """
 
-from typing import List
+from typing import Callable, Iterable, List, Optional, Tuple
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+import math
 import re
 import json
 import sys
 from difflib import SequenceMatcher
 from pathlib import Path
 
+try:
+    # C++ normalized-LCS ratio. difflib's Ratcliff-Obershelp matching blocks
+    # are a common subsequence, so this score is equal to or higher than
+    # SequenceMatcher.ratio(); falls back to difflib
+    from rapidfuzz.distance import Indel
+except ImportError:
+    Indel = None
+
 
 # Common suffixes to normalize before matching
 COMPANY_SUFFIXES = [
@@ -30,7 +43,21 @@ ADDRESS_ABBREVS = {
     "north": "n", "south": "s", "east": "e", "west": "w",
 }
 
+# Single-pass versions of the tables above
+_COMPANY_SUFFIX_RE = re.compile("|".join(COMPANY_SUFFIXES), re.IGNORECASE)
+_ADDR_FULL_RE = re.compile(r"\b(" + "|".join(re.escape(k) for k in ADDRESS_ABBREVS) + r")\b")
+_ADDR_ABBR_DOT_RE = re.compile(r"\b(" + "|".join(re.escape(v) for v in ADDRESS_ABBREVS.values()) + r")\.\b")
+_STREET_NUMBER_RE = re.compile(r"(\d+)\s+(.+)")
+
+# Blocking compares character q-grams of this length. Trigrams can't prune
+# anything at a 0.80 threshold (see _min_shared_qgrams), bigrams can.
+BLOCKING_QGRAM = 2
+
+# Source tags shared by every entity dict cross_reference builds
+_SRC_REGISTRY, _SRC_TRANSFER, _SRC_PERMIT = map(sys.intern, ("registry", "transfer", "permit"))
 
+
+@lru_cache(maxsize=16384)
 def normalize_company_name(name: str) -> str:
     """Normalize company name for matching."""
     if not name:
@@ -39,13 +66,13 @@ def normalize_company_name(name: str) -> str:
     # Remove punctuation
     name = re.sub(r"[.,;:'\"()\-]", " ", name)
     # Remove common suffixes
-    for suffix in COMPANY_SUFFIXES:
-        name = re.sub(suffix, "", name, flags=re.IGNORECASE)
+    name = _COMPANY_SUFFIX_RE.sub("", name)
     # Collapse whitespace
     name = re.sub(r"\s+", " ", name).strip()
     return name
 
 
+@lru_cache(maxsize=16384)
 def normalize_person_name(name: str) -> str:
     """Normalize person name for matching."""
     if not name:
@@ -58,6 +85,7 @@ def normalize_person_name(name: str) -> str:
     return " ".join(parts)
 
 
+@lru_cache(maxsize=16384)
 def normalize_address(address: str) -> str:
     """Normalize address for matching."""
     if not address:
@@ -66,9 +94,8 @@ def normalize_address(address: str) -> str:
     # Remove unit/suite info
     address = re.sub(r"#\d+|suite\s*\d+|unit\s*\d+", "", address)
     # Expand/normalize abbreviations
-    for full, abbr in ADDRESS_ABBREVS.items():
-        address = re.sub(rf"\b{full}\b", abbr, address)
-        address = re.sub(rf"\b{abbr}\.\b", abbr, address)
+    address = _ADDR_FULL_RE.sub(lambda m: ADDRESS_ABBREVS[m.group(1)], address)
+    address = _ADDR_ABBR_DOT_RE.sub(r"\1", address)
     # Remove postal codes
     address = re.sub(r"[A-Z]\d[A-Z]\s*\d[A-Z]\d", "", address, flags=re.IGNORECASE)
     # Remove province/country
@@ -79,11 +106,34 @@ def normalize_address(address: str) -> str:
     return address
 
 
-def similarity(a: str, b: str) -> float:
-    """Calculate similarity ratio between two strings."""
+def extract_numeric_prefix(norm_name: str) -> Optional[str]:
+    """Return the leading number of a numbered company name (6+ digits), or None."""
+    end = 0
+    while end < len(norm_name) and norm_name[end].isdecimal():
+        end += 1
+    return norm_name[:end] if end >= 6 else None
+
+
+def similarity(a: str, b: str, score_cutoff: float = 0.0) -> float:
+    """
+    Calculate similarity ratio between two strings.
+    Returns 0.0 without computing the full ratio when it is provably below score_cutoff.
+    Scores depend on whether rapidfuzz is installed: its LCS-based ratio can
+    be higher than difflib's for the same pair.
+    """
     if not a or not b:
         return 0.0
-    return SequenceMatcher(None, a, b).ratio()
+    # The ratio can't exceed 2*shorter/(total length)
+    lo, hi = sorted((len(a), len(b)))
+    if 2 * lo / (lo + hi) < score_cutoff:
+        return 0.0
+    if Indel is not None:
+        return Indel.normalized_similarity(a, b)
+    matcher = SequenceMatcher(None, a, b)
+    # Cheap O(n) upper bounds on ratio() before the full comparison
+    if matcher.quick_ratio() < score_cutoff:
+        return 0.0
+    return matcher.ratio()
 
 
 def match_company(name: str, candidates: List[dict], threshold: float = 0.80) -> List[dict]:
@@ -96,31 +146,150 @@ def match_company(name: str, candidates: List[dict], threshold: float = 0.80) ->
     if not norm_name:
         return []
 
-    matches = []
+    prepared = _prepare_candidates(candidates, normalize_company_name)
+    matches = match_company_prepared(norm_name, set(norm_name.split()), prepared, threshold)
+    return [{**candidate, "_match_score": score} for score, candidate in matches]
+
+
+def _prepare_candidates(candidates: List[dict], normalizer: Callable[[str], str], key: str = "name") -> List[tuple]:
+    """Normalize candidates once, returning (candidate, normalized, tokens, numeric prefix) tuples.
+
+    Candidates whose name normalizes to an empty string can never match and are dropped.
+    """
+    prepared = []
     for candidate in candidates:
-        norm_candidate = normalize_company_name(candidate.get("name", ""))
-        if not norm_candidate:
-            continue
+        norm_candidate = normalizer(candidate.get(key, ""))
+        if norm_candidate:
+            prepared.append((
+                candidate, norm_candidate, set(norm_candidate.split()), extract_numeric_prefix(norm_candidate),
+            ))
+    return prepared
 
-        score = similarity(norm_name, norm_candidate)
 
-        # Boost exact token overlap
-        name_tokens = set(norm_name.split())
-        cand_tokens = set(norm_candidate.split())
-        if name_tokens and cand_tokens:
-            overlap = len(name_tokens & cand_tokens) / max(len(name_tokens), len(cand_tokens))
-            score = max(score, overlap)
-
-        # Check for numbered company pattern (e.g., "102118427 Saskatchewan")
-        num_match_a = re.match(r"^(\d{6,})", norm_name)
-        num_match_b = re.match(r"^(\d{6,})", norm_candidate)
-        if num_match_a and num_match_b and num_match_a.group(1) == num_match_b.group(1):
+def _qgram_keys(text: str) -> List[tuple]:
+    """
+    Character q-grams of text, each numbered by its occurrence so that the
+    keys two strings share count their q-gram multiset intersection.
+    """
+    seen = defaultdict(int)
+    keys = []
+    for i in range(len(text) - BLOCKING_QGRAM + 1):
+        gram = text[i:i + BLOCKING_QGRAM]
+        seen[gram] += 1
+        keys.append((gram, seen[gram]))
+    return keys
+
+
+def _min_shared_qgrams(n: int, m: int, threshold: float) -> Optional[int]:
+    """
+    Fewest q-grams strings of lengths n and m must share for similarity() to
+    reach threshold, or None if no pair of those lengths can reach it.
+
+    similarity() never exceeds the LCS ratio 2*lcs/(n+m). Along an LCS
+    alignment, each unmatched character of one string breaks at most q of
+    its q-grams and each gap in the other at most q-1; the rest are shared.
+    """
+    q = BLOCKING_QGRAM
+    # The small slack keeps float rounding from ever raising the bound
+    lcs = math.ceil(threshold * (n + m) / 2 - 1e-9)
+    if lcs > min(n, m):
+        return None
+    return max(
+        (n - q + 1) - q * (n - lcs) - (q - 1) * (m - lcs),
+        (m - q + 1) - q * (m - lcs) - (q - 1) * (n - lcs),
+    )
+
+
+def _build_block_index(prepared: List[tuple]) -> tuple:
+    """Index prepared candidates by q-gram, token, numeric prefix and length for _block_candidates."""
+    gram_index = defaultdict(list)
+    token_index = defaultdict(list)
+    number_index = defaultdict(list)
+    by_length = defaultdict(list)
+    for i, (_, norm_candidate, cand_tokens, cand_num) in enumerate(prepared):
+        for key in _qgram_keys(norm_candidate):
+            gram_index[key].append(i)
+        for token in cand_tokens:
+            token_index[token].append(i)
+        if cand_num:
+            number_index[cand_num].append(i)
+        by_length[len(norm_candidate)].append(i)
+    return gram_index, token_index, number_index, by_length
+
+
+def _block_candidates(
+    norm_name: str, name_tokens: set, block_index: tuple, prepared: List[tuple], threshold: float,
+) -> List[tuple]:
+    """
+    Return the prepared candidates that can score at least threshold in
+    match_company_prepared: same numeric prefix, token overlap at or above
+    threshold, or enough shared q-grams for similarity() to reach it.
+    Every candidate left out would have scored below threshold.
+    """
+    if threshold <= 0:
+        return prepared
+    gram_index, token_index, number_index, by_length = block_index
+    n = len(norm_name)
+    candidate_ids = set()
+
+    # Lengths whose bound is <= 0 can't be pruned by q-grams at all
+    min_shared = {}
+    for m, ids in by_length.items():
+        need = _min_shared_qgrams(n, m, threshold)
+        if need is None:
+            continue
+        if need <= 0:
+            candidate_ids.update(ids)
+        else:
+            min_shared[m] = need
+    if min_shared:
+        shared = Counter(chain.from_iterable(gram_index[k] for k in _qgram_keys(norm_name) if k in gram_index))
+        for i, count in shared.items():
+            if count >= min_shared.get(len(prepared[i][1]), math.inf):
+                candidate_ids.add(i)
+
+    # Same overlap score match_company_prepared computes
+    if name_tokens:
+        shared = Counter(chain.from_iterable(token_index[t] for t in name_tokens if t in token_index))
+        for i, count in shared.items():
+            if count / max(len(name_tokens), len(prepared[i][2])) >= threshold:
+                candidate_ids.add(i)
+
+    name_num = extract_numeric_prefix(norm_name)
+    if name_num:
+        candidate_ids.update(number_index.get(name_num, ()))
+
+    # Keep the original order so ties sort the same as an unblocked scan
+    return [prepared[i] for i in sorted(candidate_ids)]
+
+
+def match_company_prepared(
+    norm_name: str, name_tokens: set, prepared: List[tuple], threshold: float = 0.80,
+) -> List[Tuple[float, dict]]:
+    """
+    Like match_company, but for an already-normalized query and candidates
+    built with _prepare_candidates. Use when matching many names against the same list.
+    Returns (score, candidate) tuples sorted by score descending; candidates aren't copied.
+    """
+    name_num = extract_numeric_prefix(norm_name)
+    matches = []
+    for candidate, norm_candidate, cand_tokens, cand_num in prepared:
+        # Numbered companies (e.g., "102118427 Saskatchewan") match on the number alone
+        if name_num and name_num == cand_num:
             score = 1.0
+        else:
+            # Exact token overlap
+            overlap = 0.0
+            if name_tokens and cand_tokens:
+                overlap = len(name_tokens & cand_tokens) / max(len(name_tokens), len(cand_tokens))
+
+            # The ratio only matters if it beats both the threshold and the overlap
+            score = max(similarity(norm_name, norm_candidate, max(threshold, overlap)), overlap)
 
         if score >= threshold:
-            matches.append({**candidate, "_match_score": round(score, 3)})
+            matches.append((round(score, 3), candidate))
 
-    matches.sort(key=lambda x: x["_match_score"], reverse=True)
+    matches.sort(key=itemgetter(0), reverse=True)
     return matches
 
 
@@ -139,11 +308,11 @@ def match_person(name: str, candidates: List[dict], threshold: float = 0.85) ->
         if not norm_candidate:
             continue
 
-        score = similarity(norm_name, norm_candidate)
-
         # Exact match on sorted parts
         if norm_name == norm_candidate:
             score = 1.0
+        else:
+            score = similarity(norm_name, norm_candidate, threshold)
 
         if score >= threshold:
             matches.append({**candidate, "_match_score": round(score, 3)})
@@ -161,19 +330,19 @@ def match_address(address: str, candidates: List[dict], threshold: float = 0.75)
     if not norm_addr:
         return []
 
+    num_a = _STREET_NUMBER_RE.match(norm_addr)
     matches = []
     for candidate in candidates:
         norm_candidate = normalize_address(candidate.get("address", ""))
         if not norm_candidate:
             continue
 
-        score = similarity(norm_addr, norm_candidate)
+        score = similarity(norm_addr, norm_candidate, threshold)
 
         # Check if street number and name match exactly
-        num_a = re.match(r"(\d+)\s+(.+)", norm_addr)
-        num_b = re.match(r"(\d+)\s+(.+)", norm_candidate)
+        num_b = _STREET_NUMBER_RE.match(norm_candidate)
         if num_a and num_b and num_a.group(1) == num_b.group(1):
-            street_score = similarity(num_a.group(2), num_b.group(2))
+            street_score = similarity(num_a.group(2), num_b.group(2), threshold / 0.95)
             score = max(score, street_score * 0.95)
 
         if score >= threshold:
@@ -184,13 +353,15 @@ def match_address(address: str, candidates: List[dict], threshold: float = 0.75)
 
 
 def cross_reference(
-    registry_data: list[dict],
-    transfers: list[dict],
-    permits: list[dict],
+    registry_data: Iterable[dict],
+    transfers: Iterable[dict],
+    permits: Iterable[dict],
     company_threshold: float = 0.80,
 ) -> dict:
     """
     Cross-reference entities across all three data sources.
+    Each source is read once, so transfers and permits can be the streaming
+    iter_transfer_list / iter_building_permits generators.
     Returns a dict of linked entities with connections.
     """
     # Build entity lists
@@ -200,14 +371,20 @@ def cross_reference(
         registry_companies.append({
             "name": reg.get("entity_name", ""),
             "entity_number": reg.get("entity_number"),
-            "source": "registry",
+            "source": _SRC_REGISTRY,
         })
+        # Roles ("Director", "Officer", ...) and the company name repeat for
+        # every person, so share one string object per distinct value
+        company = reg.get("entity_name")
+        if company:
+            company = sys.intern(company)
         for d in reg.get("directors", []) + reg.get("officers", []) + reg.get("shareholders", []):
+            role = d.get("role")
             registry_people.append({
                 "name": d.get("name", ""),
-                "role": d.get("role"),
-                "company": reg.get("entity_name"),
-                "source": "registry",
+                "role": sys.intern(role) if role else role,
+                "company": company,
+                "source": _SRC_REGISTRY,
             })
 
     # Collect unique company names from transfers
@@ -218,39 +395,53 @@ def cross_reference(
         if t.get("purchaser"):
             transfer_companies.add(t["purchaser"])
 
-    transfer_company_list = [{"name": n, "source": "transfer"} for n in transfer_companies]
+    transfer_company_list = [{"name": n, "source": _SRC_TRANSFER} for n in transfer_companies]
 
     # Collect unique company names from permits
     permit_companies = set()
     for p in permits:
         if p.get("owner"):
             permit_companies.add(p["owner"])
-    permit_company_list = [{"name": n, "source": "permit"} for n in permit_companies]
+    permit_company_list = [{"name": n, "source": _SRC_PERMIT} for n in permit_companies]
 
     # Cross-reference: registry companies -> transfers & permits
+    # Candidates are normalized once up front rather than once per query.
     links = []
-    all_external = transfer_company_list + permit_company_list
+    transfer_prepared = _prepare_candidates(transfer_company_list, normalize_company_name)
+    permit_prepared = _prepare_candidates(permit_company_list, normalize_company_name)
+    all_external = transfer_prepared + permit_prepared
+
+    # Only score candidates that can reach the threshold (record-linkage
+    # blocking) instead of every registry x external pair
+    external_index = _build_block_index(all_external)
+    permit_index = _build_block_index(permit_prepared)
 
     for reg_co in registry_companies:
-        matches = match_company(reg_co["name"], all_external, company_threshold)
-        for m in matches:
+        norm_name = normalize_company_name(reg_co["name"])
+        if not norm_name:
+            continue
+        name_tokens = set(norm_name.split())
+        blocked = _block_candidates(norm_name, name_tokens, external_index, all_external, company_threshold)
+        matches = match_company_prepared(norm_name, name_tokens, blocked, company_threshold)
+        for score, m in matches:
             links.append({
                 "registry_entity": reg_co["name"],
                 "entity_number": reg_co.get("entity_number"),
                 "matched_name": m["name"],
                 "matched_source": m["source"],
-                "score": m["_match_score"],
+                "score": score,
             })
 
     # Cross-reference: transfer vendors/purchasers -> permits
-    for tc in transfer_company_list:
-        matches = match_company(tc["name"], permit_company_list, company_threshold)
-        for m in matches:
+    for tc, norm_name, name_tokens, _ in transfer_prepared:
+        blocked = _block_candidates(norm_name, name_tokens, permit_index, permit_prepared, company_threshold)
+        matches = match_company_prepared(norm_name, name_tokens, blocked, company_threshold)
+        for score, m in matches:
             links.append({
                 "transfer_entity": tc["name"],
                 "matched_name": m["name"],
-                "matched_source": "permit",
-                "score": m["_match_score"],
+                "matched_source": _SRC_PERMIT,
+                "score": score,
             })
 
     return {
@@ -4,23 +4,34 @@ Parses City of Saskatoon property transfer list (Excel/XLSX).
 Columns: Roll #, Civic_Address, Vendor, Purchaser, Sales_Date, Sales_Price, PPT, PPT_Descriptor
 """
 
-from typing import Optional, List
-import openpyxl
+from typing import Iterator, Optional, List
 import json
 import sys
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    # Slower pure-Python fallback for environments without calamine
+    CalamineWorkbook = None
+    import openpyxl
+
 
 def parse_transfer_list(xlsx_path: str) -> List[dict]:
     """Parse transfer list Excel file into structured records."""
-    wb = openpyxl.load_workbook(xlsx_path, read_only=True)
-    ws = wb.active
+    return list(iter_transfer_list(xlsx_path))
+
+
+def iter_transfer_list(xlsx_path: str) -> Iterator[dict]:
+    """Like parse_transfer_list, but yields records one row at a time."""
+    # Local names avoid global lookups in the row loop
+    clean_name = _clean_name
+    format_date = _format_date
 
-    records = []
     headers = None
 
-    for row in ws.iter_rows(values_only=True):
+    for row in _iter_rows(xlsx_path):
         # First row is headers
         if headers is None:
             # Take only meaningful columns (first 8)
@@ -34,14 +45,14 @@ def parse_transfer_list(xlsx_path: str) -> List[dict]:
 
         roll_number = str(vals[0]) if vals[0] else None
         address = str(vals[1]).strip() if vals[1] else None
-        vendor = _clean_name(vals[2])
-        purchaser = _clean_name(vals[3])
-        sales_date = _format_date(vals[4])
+        vendor = clean_name(vals[2])
+        purchaser = clean_name(vals[3])
+        sales_date = format_date(vals[4])
         sales_price = float(vals[5]) if vals[5] else None
         ppt_code = str(vals[6]).strip() if vals[6] else None
         ppt_descriptor = str(vals[7]).strip() if vals[7] else None
 
-        records.append({
+        yield {
             "roll_number": roll_number,
             "address": address,
             "vendor": vendor,
@@ -50,10 +61,28 @@ def parse_transfer_list(xlsx_path: str) -> List[dict]:
             "sales_price": sales_price,
             "property_type_code": ppt_code,
             "property_type": ppt_descriptor,
-        })
-
-    wb.close()
-    return records
+        }
+
+
+def _iter_rows(xlsx_path: str) -> Iterator[list]:
+    """Yield the first sheet's rows as lists of cell values, via calamine when available."""
+    if CalamineWorkbook is not None:
+        with CalamineWorkbook.from_path(xlsx_path) as wb:
+            sheet = wb.get_sheet_by_index(0)
+            # iter_rows converts one row at a time rather than the whole sheet,
+            # and pads skipped leading rows but not columns; restore those so
+            # cells stay aligned with the headers
+            pad = [""] * sheet.start[1] if sheet.start else []
+            for row in sheet.iter_rows():
+                # calamine reads every number as a float; restore ints like openpyxl
+                yield pad + [int(v) if isinstance(v, float) and v.is_integer() else v for v in row]
+    else:
+        # data_only returns cached formula results instead of formula strings
+        wb = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
+        try:
+            yield from wb.active.iter_rows(values_only=True)
+        finally:
+            wb.close()
 
 
 def _clean_name(val) -> Optional[str]:
@@ -67,7 +96,7 @@ def _format_date(val) -> Optional[str]:
     """Format date to ISO string."""
     if not val:
         return None
-    if isinstance(val, datetime):
+    if isinstance(val, (datetime, date)):
         return val.strftime("%Y-%m-%d")
     return str(val)
 